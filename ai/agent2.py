@@ -4,46 +4,155 @@ Agent 2: The Exploit Confirmer
 Validates vulnerabilities from Agent 1 through symbolic execution and practical exploit testing.
 Generates test scripts to confirm if vulnerabilities are practically exploitable.
 """
+import argparse
+import asyncio
+import atexit
+import copy
+import functools
+import hashlib
 import json
-import sys
+import queue
+import re
+import shutil
 import subprocess
+import sys
 import tempfile
+import threading
 import os
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 import time
-from dotenv import load_dotenv
-from hedera import Client, PrivateKey, TopicMessageSubmitTransaction, TopicId
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+# Optional streaming JSON parser; we fall back to buffered json.loads without it
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Optional NumPy for vectorized scoring; we fall back to the scalar loop without it
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Optional orjson for fast (de)serialization of the large report payloads
+try:
+    import orjson
+
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode()
 
-# Load environment variables
-load_dotenv()
+    _json_loads = json.loads
+
+# Load environment variables. The hedera SDK (JVM-backed, multi-second import)
+# is deferred to first HCS use, and dotenv is only imported when a .env exists,
+# so the common TEST_MODE=true path pays neither import cost.
+if os.path.exists('.env'):
+    from dotenv import load_dotenv
+    load_dotenv()
+
+# HCS configuration is constant for the process lifetime, so snapshot it once
+# instead of re-reading the environment on every log call
+_HEDERA_ACCOUNT_ID = os.getenv('HEDERA_ACCOUNT_ID')
+_HEDERA_PRIVATE_KEY = os.getenv('HEDERA_PRIVATE_KEY')
+_HEDERA_TOPIC_ID = os.getenv('HEDERA_TOPIC_ID')
+_HCS_ENABLED = os.getenv('TEST_MODE', 'true').lower() != 'true' and bool(_HEDERA_TOPIC_ID)
+
+# HCS messages are queued and submitted in batches by a background thread so
+# the hot log() path never blocks on a network round-trip.
+_HCS_BATCH_SIZE = 32
+_HCS_BATCH_WINDOW = 0.25  # seconds to wait for more messages before submitting
+_HCS_QUEUE: "queue.Queue[str]" = queue.Queue()
+_HCS_WORKER_LOCK = threading.Lock()
+_HCS_WORKER = None
+
+# Serializes stderr writes now that findings are processed on worker threads
+_LOG_LOCK = threading.Lock()
 
 def log(message: str, run_id: str) -> None:
     """
     Prints a structured log message to stderr for the Master Agent to capture.
-    Also submits to HCS if configured.
+    Also submits to HCS if configured. Safe to call from worker threads.
     Args:
         message: The log message
         run_id: The unique ID for the audit run
     """
     log_message = f"[Agent 2][{run_id}] {message}"
-    print(log_message, file=sys.stderr)
-    
-    # Submit to HCS if not in test mode
-    if os.getenv('TEST_MODE', 'true').lower() != 'true':
+    with _LOG_LOCK:
+        print(log_message, file=sys.stderr)
+
+    # Enqueue for HCS if not in test mode; the worker thread batches submissions
+    if _HCS_ENABLED:
+        _ensure_hcs_worker()
+        _HCS_QUEUE.put_nowait(log_message)
+
+def _hcs_worker_loop() -> None:
+    """Drains the log queue, coalescing messages into batched HCS submissions."""
+    while True:
+        batch = [_HCS_QUEUE.get()]
+        deadline = time.monotonic() + _HCS_BATCH_WINDOW
+        while len(batch) < _HCS_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_HCS_QUEUE.get(timeout=remaining))
+            except queue.Empty:
+                break
         try:
-            submit_hcs_log(log_message)
+            submit_hcs_log("\n".join(batch))
         except Exception as e:
-            print(f"[Agent 2][{run_id}] HCS logging failed: {e}", file=sys.stderr)
+            print(f"[Agent 2] HCS logging failed: {e}", file=sys.stderr)
+        finally:
+            for _ in batch:
+                _HCS_QUEUE.task_done()
+
+def _ensure_hcs_worker() -> None:
+    """Lazily starts the HCS submission thread on first use."""
+    global _HCS_WORKER
+    if _HCS_WORKER is None:
+        with _HCS_WORKER_LOCK:
+            if _HCS_WORKER is None:
+                _HCS_WORKER = threading.Thread(
+                    target=_hcs_worker_loop,
+                    name="hcs-log-worker",
+                    daemon=True
+                )
+                _HCS_WORKER.start()
+                atexit.register(_flush_hcs)
+
+def _flush_hcs() -> None:
+    """Waits for queued HCS messages and closes the shared client on shutdown."""
+    try:
+        _HCS_QUEUE.join()
+    except Exception:
+        pass
+    try:
+        client = create_hedera_client()
+    except Exception:
+        client = None
+    if client is not None:
+        try:
+            client.close()
+        except Exception:
+            pass
 
+@functools.lru_cache(maxsize=1)
 def create_hedera_client():
     """Create and configure a Hedera client for HCS logging."""
     try:
         from hedera import Client, PrivateKey
-        
-        account_id = os.getenv('HEDERA_ACCOUNT_ID')
-        private_key_str = os.getenv('HEDERA_PRIVATE_KEY')
-        
+
+        account_id = _HEDERA_ACCOUNT_ID
+        private_key_str = _HEDERA_PRIVATE_KEY
+
         if not account_id or not private_key_str:
             return None
             
@@ -56,62 +165,70 @@ def create_hedera_client():
         
         return client
     except Exception as e:
-        log(f"Failed to create Hedera client: {e}")
+        # Write straight to stderr: log() would enqueue to HCS, which needs
+        # this very client, and this path can run from the atexit hook
+        print(f"[Agent 2] Failed to create Hedera client: {e}", file=sys.stderr)
         return None
 
 def submit_hcs_log(message):
     """
-    Submits a log message to the configured HCS topic.
+    Submits a (possibly batched) log message to the configured HCS topic.
     """
-    topic_id_str = os.getenv('HEDERA_TOPIC_ID')
+    topic_id_str = _HEDERA_TOPIC_ID
     if not topic_id_str:
         return  # Skip HCS logging if no topic configured
-    
+
     try:
+        from hedera import TopicMessageSubmitTransaction, TopicId
+
+        # The client is shared across submissions and closed at shutdown
         client = create_hedera_client()
+        if not client:
+            return
         topic_id = TopicId.from_string(topic_id_str)
-        
+
         transaction = TopicMessageSubmitTransaction() \
             .set_topic_id(topic_id) \
             .set_message(message)
-        
+
         response = transaction.execute(client)
         receipt = response.get_receipt(client)
-        
-        client.close()
-        
+
     except Exception as e:
         # Don't fail the analysis if HCS logging fails
         pass
 
-def run_command(command: str, timeout: int = 120) -> Dict[str, Any]:
+async def run_command_async(argv: List[str], timeout: int = 120) -> Dict[str, Any]:
     """
-    Runs a command-line command with timeout and error handling.
+    Runs a command-line command asynchronously with timeout and error handling.
     Args:
-        command: The command to execute
+        argv: The command and its arguments as a list
         timeout: Command timeout in seconds
     Returns:
         Dictionary with stdout, stderr, and success status
     """
     try:
-        result = subprocess.run(
-            command.split(),
-            capture_output=True,
-            text=True,
-            timeout=timeout
+        proc = await asyncio.create_subprocess_exec(
+            *argv,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
         )
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            return {
+                "stdout": "",
+                "stderr": f"Command timed out after {timeout} seconds",
+                "success": False,
+                "returncode": -1
+            }
         return {
-            "stdout": result.stdout,
-            "stderr": result.stderr,
-            "success": result.returncode == 0,
-            "returncode": result.returncode
-        }
-    except subprocess.TimeoutExpired:
-        return {
-            "stdout": "",
-            "stderr": f"Command timed out after {timeout} seconds",
-            "success": False,
-            "returncode": -1
+            "stdout": stdout.decode(),
+            "stderr": stderr.decode(),
+            "success": proc.returncode == 0,
+            "returncode": proc.returncode
         }
     except Exception as e:
         return {
@@ -121,77 +238,282 @@ def run_command(command: str, timeout: int = 120) -> Dict[str, Any]:
             "returncode": -1
         }
 
-def run_mythril_analysis(contract_path: Path, run_id: str) -> List[Dict[str, Any]]:
+# Shared defaults for normalized Mythril findings; built once so per-issue
+# construction is a single dict merge instead of a dozen .get calls that
+# allocate fresh default values each time.
+_MYTHRIL_FINDING_DEFAULTS = {
+    "tool": "mythril",
+    "title": "Unknown Mythril Issue",
+    "description": "",
+    "severity": "Medium",
+    "swc_id": "",
+    "lineno": 1,
+    "filename": "",
+    "function": "",
+    "address": 0,
+    "debug": "",
+    "confirmed": False,
+    "exploitability_score": 0.0
+}
+
+# Mythril report keys that differ from our finding schema
+_MYTHRIL_KEY_RENAMES = {"swc-id": "swc_id"}
+
+def _issue_to_finding(issue: Dict[str, Any], contract_path: Path) -> Dict[str, Any]:
+    """Normalizes a raw Mythril issue object into a finding dict."""
+    finding = {
+        **_MYTHRIL_FINDING_DEFAULTS,
+        **{
+            _MYTHRIL_KEY_RENAMES.get(key, key): value
+            for key, value in issue.items()
+            if _MYTHRIL_KEY_RENAMES.get(key, key) in _MYTHRIL_FINDING_DEFAULTS
+        }
+    }
+    if not finding["filename"]:
+        finding["filename"] = str(contract_path)
+    return finding
+
+class _TeeReader:
+    """File-like wrapper that records the bytes read, so the text-parse
+    fallback still sees the full output if streaming JSON parsing fails."""
+    def __init__(self, raw):
+        self._raw = raw
+        self.seen = bytearray()
+        self._recording = True
+
+    def read(self, size=-1):
+        chunk = self._raw.read(size)
+        if chunk and self._recording:
+            self.seen.extend(chunk)
+        return chunk
+
+    def stop_recording(self):
+        """Discards the buffer once the output is known to be valid JSON."""
+        self._recording = False
+        self.seen = bytearray()
+
+def _stream_mythril_issues(command: List[str], contract_path: Path, run_id: str,
+                           timeout: int = 120) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Runs Mythril and parses its JSON report incrementally with ijson, so
+    issues are materialized as Mythril writes them instead of buffering the
+    whole report in memory first. stderr is drained on a side thread so a
+    chatty child never blocks on a full pipe, and a watchdog timer enforces
+    the same deadline as the buffered path.
+
+    Returns the findings and whether the analysis actually succeeded, so
+    failed or timed-out runs are never persisted to the cache.
+    """
+    mythril_findings = []
+    try:
+        proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except Exception as e:
+        log(f"Mythril analysis failed or produced no output: {e}", run_id)
+        return mythril_findings, False
+
+    stderr_chunks: List[bytes] = []
+    stderr_thread = threading.Thread(
+        target=lambda: stderr_chunks.append(proc.stderr.read()),
+        name="mythril-stderr-drain",
+        daemon=True
+    )
+    stderr_thread.start()
+
+    # Killing the child closes its stdout, which unblocks the parse loop below
+    timed_out = threading.Event()
+
+    def _kill_on_timeout():
+        timed_out.set()
+        proc.kill()
+
+    watchdog = threading.Timer(timeout, _kill_on_timeout)
+    watchdog.start()
+
+    reader = _TeeReader(proc.stdout)
+    parse_error = None
+
+    try:
+        for issue in ijson.items(reader, "issues.item"):
+            mythril_findings.append(_issue_to_finding(issue, contract_path))
+            # The output parses as JSON, so the text fallback cannot trigger;
+            # stop buffering and keep only the issues themselves in memory.
+            reader.stop_recording()
+    except ijson.JSONError as e:
+        parse_error = e
+
+    # Drain the pipes and reap the process
+    remainder = proc.stdout.read() or b""
+    watchdog.cancel()
+    stderr_thread.join()
+    stderr = (stderr_chunks[0] if stderr_chunks else b"").decode(errors="replace")
+    returncode = proc.wait()
+
+    if timed_out.is_set():
+        log(f"Mythril analysis timed out after {timeout}s", run_id)
+        return mythril_findings, False
+
+    # Match the buffered path, which requires a zero exit status: Mythril
+    # reports e.g. solc compile failures as valid JSON with no issues, and
+    # that must not be cached or reported as a clean result.
+    if returncode != 0:
+        log(f"Mythril analysis failed with exit status {returncode}: {stderr}", run_id)
+        return mythril_findings, False
+
+    if parse_error is not None:
+        # Buffer only on the fallback path
+        output = (bytes(reader.seen) + remainder).decode(errors="replace")
+        if output.strip():
+            log(f"Warning: Failed to parse Mythril JSON output: {parse_error}", run_id)
+            mythril_findings = parse_mythril_text_output(output, contract_path, run_id)
+        else:
+            log(f"Mythril analysis failed or produced no output: {stderr}", run_id)
+            return mythril_findings, False
+
+    return mythril_findings, True
+
+# Resolve the Mythril binary once at import instead of a PATH walk per invocation
+_MYTH_BIN = shutil.which("myth") or "myth"
+
+@functools.lru_cache(maxsize=1)
+def _mythril_version() -> str:
+    """Returns the installed Mythril version string (cached per process)."""
+    try:
+        result = subprocess.run(
+            [_MYTH_BIN, "version"],
+            capture_output=True,
+            text=True,
+            timeout=30
+        )
+        return result.stdout.strip() or result.stderr.strip() or "unknown"
+    except Exception:
+        return "unknown"
+
+# Overridable via --cache-dir; defaults to the per-user cache directory
+_CACHE_DIR = None
+
+def _mythril_cache_path(contract_path: Path) -> Path:
+    """
+    Returns the persistent cache location for this contract's Mythril results.
+    Symbolic execution is deterministic for a given contract + Mythril version,
+    so the key is SHA-256 over the contract bytes and the version string.
+    """
+    digest = hashlib.sha256(
+        contract_path.read_bytes() + _mythril_version().encode()
+    ).hexdigest()
+    cache_dir = _CACHE_DIR or Path.home() / ".cache" / "aegis-audit" / "mythril"
+    return cache_dir / f"{digest}.json"
+
+def _write_mythril_cache(cache_path: Path, findings: List[Dict[str, Any]]) -> None:
+    """Atomically persists Mythril findings so concurrent runs never see a partial file."""
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile("w", dir=cache_path.parent, delete=False) as tmp:
+        json.dump(findings, tmp)
+    os.replace(tmp.name, cache_path)
+
+async def run_mythril_analysis_async(contract_path: Path, run_id: str) -> List[Dict[str, Any]]:
     """
     Runs Mythril symbolic execution analysis on the contract.
+    Results are cached on disk keyed by contract hash + Mythril version, so
+    re-runs of an unchanged contract skip symbolic execution entirely
+    (set AEGIS_NO_CACHE=1 to bypass).
     Args:
         contract_path: Path to the Solidity contract
         run_id: Unique run identifier
     Returns:
         List of Mythril findings
     """
+    cache_path = None
+    if os.getenv("AEGIS_NO_CACHE") != "1":
+        try:
+            cache_path = await asyncio.to_thread(_mythril_cache_path, contract_path)
+            # The key hashes the contract bytes and Mythril version, so an
+            # existing entry is valid by construction; no freshness check needed
+            if cache_path.exists():
+                with open(cache_path, 'r') as f:
+                    cached_findings = json.load(f)
+                log(f"Using cached Mythril results for {contract_path.name} ({len(cached_findings)} issues)", run_id)
+                return cached_findings
+        except Exception as e:
+            log(f"Warning: Mythril cache lookup failed: {e}", run_id)
+
     log(f"Starting Mythril symbolic execution on {contract_path.name}", run_id)
-    
-    # Create temporary directory for Mythril output
-    with tempfile.TemporaryDirectory() as temp_dir:
-        report_path = Path(temp_dir) / f"mythril_report_{run_id}.json"
-        
-        # Run Mythril with JSON output
-        command = f"myth analyze {contract_path} --execution-timeout 60 -o json"
-        result = run_command(command, timeout=120)
-        
+
+    # Run Mythril with JSON output (written to stdout; no scratch dir needed)
+    command = [_MYTH_BIN, "analyze", str(contract_path), "--execution-timeout", "60", "-o", "json"]
+
+    if ijson is not None:
+        # Stream-parse issues off the pipe as Mythril produces them
+        mythril_findings, analysis_ok = await asyncio.to_thread(
+            _stream_mythril_issues, command, contract_path, run_id
+        )
+    else:
+        result = await run_command_async(command, timeout=120)
         mythril_findings = []
-        
-        if result["success"] and result["stdout"]:
+        analysis_ok = bool(result["success"] and result["stdout"])
+
+        if analysis_ok:
             try:
                 # Parse Mythril JSON output
                 mythril_data = json.loads(result["stdout"])
-                
-                if "issues" in mythril_data:
-                    for issue in mythril_data["issues"]:
-                        finding = {
-                            "tool": "mythril",
-                            "title": issue.get("title", "Unknown Mythril Issue"),
-                            "description": issue.get("description", ""),
-                            "severity": issue.get("severity", "Medium"),
-                            "swc_id": issue.get("swc-id", ""),
-                            "lineno": issue.get("lineno", 1),
-                            "filename": issue.get("filename", str(contract_path)),
-                            "function": issue.get("function", ""),
-                            "address": issue.get("address", 0),
-                            "debug": issue.get("debug", ""),
-                            "confirmed": False,
-                            "exploitability_score": 0.0
-                        }
-                        mythril_findings.append(finding)
-                        
+
+                mythril_findings = [
+                    _issue_to_finding(issue, contract_path)
+                    for issue in mythril_data.get("issues", [])
+                ]
+
             except json.JSONDecodeError as e:
                 log(f"Warning: Failed to parse Mythril JSON output: {e}", run_id)
                 # Fallback to text parsing
                 mythril_findings = parse_mythril_text_output(result["stdout"], contract_path, run_id)
         else:
             log(f"Mythril analysis failed or produced no output: {result['stderr']}", run_id)
-            
-        log(f"Mythril analysis complete. Found {len(mythril_findings)} potential issues", run_id)
-        return mythril_findings
+
+    # Never cache a failed run; an empty result from a crash or timeout would
+    # otherwise shadow every later audit of this contract/version.
+    if cache_path is not None and analysis_ok:
+        try:
+            _write_mythril_cache(cache_path, mythril_findings)
+        except Exception as e:
+            log(f"Warning: Failed to write Mythril cache: {e}", run_id)
+
+    log(f"Mythril analysis complete. Found {len(mythril_findings)} potential issues", run_id)
+    return mythril_findings
+
+# One pass over the whole buffer instead of per-line startswith tests; the
+# unnamed '----' alternative swallows separator lines so they never reach
+# the description group.
+_MYTHRIL_TEXT_PATTERN = re.compile(
+    r'^[ \t]*(?:'
+    r'==== (?P<title>.+?)'
+    r'|SWC ID:(?P<swc>.+?)'
+    r'|Severity:(?P<sev>.+?)'
+    r'|----.*'
+    r'|(?P<desc>\S.*?)'
+    r')[ \t]*\r?$',
+    re.M
+)
 
 def parse_mythril_text_output(output: str, contract_path: Path, run_id: str) -> List[Dict[str, Any]]:
     """
     Fallback parser for Mythril text output when JSON parsing fails.
     """
     findings = []
-    lines = output.split('\n')
-    current_issue = {}
-    
-    for line in lines:
-        line = line.strip()
-        if line.startswith('==== '):
+    current_issue = None
+    desc_parts = []
+
+    def _finalize():
+        current_issue["description"] = " ".join(desc_parts)
+        findings.append(current_issue)
+
+    for match in _MYTHRIL_TEXT_PATTERN.finditer(output):
+        group = match.lastgroup
+        if group == "title":
             # New vulnerability found
-            if current_issue:
-                findings.append(current_issue)
+            if current_issue is not None:
+                _finalize()
             current_issue = {
                 "tool": "mythril",
-                "title": line.replace('====', '').strip(),
+                "title": match.group("title").replace('====', '').strip(),
                 "description": "",
                 "severity": "Medium",
                 "lineno": 1,
@@ -199,140 +521,151 @@ def parse_mythril_text_output(output: str, contract_path: Path, run_id: str) ->
                 "confirmed": False,
                 "exploitability_score": 0.0
             }
-        elif line.startswith('SWC ID:') and current_issue:
-            current_issue["swc_id"] = line.replace('SWC ID:', '').strip()
-        elif line.startswith('Severity:') and current_issue:
-            current_issue["severity"] = line.replace('Severity:', '').strip()
-        elif line and current_issue and not line.startswith('----'):
-            current_issue["description"] += line + " "
-    
+            desc_parts = []
+        elif current_issue is None:
+            continue
+        elif group == "swc":
+            current_issue["swc_id"] = match.group("swc").strip()
+        elif group == "sev":
+            current_issue["severity"] = match.group("sev").strip()
+        elif group == "desc":
+            desc_parts.append(match.group("desc"))
+
     # Add the last issue if exists
-    if current_issue:
-        findings.append(current_issue)
-    
+    if current_issue is not None:
+        _finalize()
+
     return findings
 
-def generate_exploit_test(finding: Dict[str, Any], contract_code: str, run_id: str) -> Dict[str, Any]:
+@dataclass(frozen=True)
+class AuditContext:
+    """
+    Immutable per-run context shared by every exploit test generator.
+    Hashable, so contract-derived analyses can be memoized per run via
+    lru_cache helpers keyed on it.
+    """
+    contract_code: str
+    contract_path: Path
+    run_id: str
+
+def generate_exploit_test(finding: Dict[str, Any], ctx: AuditContext) -> Dict[str, Any]:
     """
     Generates a test script to confirm if a vulnerability is exploitable.
     Args:
         finding: Vulnerability finding from Agent 1 or Mythril
-        contract_code: The contract source code
-        run_id: Unique run identifier
+        ctx: Shared audit context for this run
     Returns:
         Dictionary with exploit test results
     """
-    log(f"Generating exploit test for: {finding.get('check', finding.get('title', 'Unknown'))}", run_id)
-    
-    exploit_result = {
-        "test_generated": False,
-        "test_executed": False,
-        "exploit_confirmed": False,
-        "test_output": "",
-        "confidence_score": 0.0
-    }
-    
+    log(f"Generating exploit test for: {finding.get('check', finding.get('title', 'Unknown'))}", ctx.run_id)
+
     # Determine vulnerability type and generate appropriate test
     vuln_type = finding.get('check', finding.get('title', '')).lower()
-    
-    if 'reentrancy' in vuln_type:
-        exploit_result = generate_reentrancy_test(finding, contract_code, run_id)
-    elif 'unchecked-call' in vuln_type or 'low-level-calls' in vuln_type:
-        exploit_result = generate_unchecked_call_test(finding, contract_code, run_id)
-    elif 'timestamp' in vuln_type or 'block-timestamp' in vuln_type:
-        exploit_result = generate_timestamp_test(finding, contract_code, run_id)
-    elif 'integer' in vuln_type or 'overflow' in vuln_type or 'underflow' in vuln_type:
-        exploit_result = generate_integer_overflow_test(finding, contract_code, run_id)
-    else:
-        # Generic test for other vulnerability types
-        exploit_result = generate_generic_test(finding, contract_code, run_id)
-    
-    return exploit_result
 
-def generate_reentrancy_test(finding: Dict[str, Any], contract_code: str, run_id: str) -> Dict[str, Any]:
-    """Generates a reentrancy exploit test."""
-    log("Generating reentrancy exploit test", run_id)
-    
-    # Create a simple reentrancy test template
-    test_template = f'''
+    match = _VULN_CLASSIFIER.search(vuln_type)
+    handler = _HANDLERS[match.lastgroup] if match else generate_generic_test
+    return handler(finding, ctx)
+
+@functools.lru_cache(maxsize=16)
+def _template_for(category: str) -> str:
+    """Returns the (immutable) exploit test code for a vulnerability category."""
+    if category == "reentrancy":
+        # Simple reentrancy test template
+        return '''
 // SPDX-License-Identifier: MIT
 pragma solidity ^0.8.0;
 
 import "forge-std/Test.sol";
 
-contract ReentrancyExploit is Test {{
+contract ReentrancyExploit is Test {
     // Target contract instance
     address target;
-    
-    function setUp() public {{
+
+    function setUp() public {
         // Deploy target contract
         // target = address(new TargetContract());
-    }}
-    
-    function testReentrancyExploit() public {{
+    }
+
+    function testReentrancyExploit() public {
         // Attempt reentrancy attack
         // This is a template - actual implementation depends on contract structure
         assertTrue(false, "Reentrancy test template - needs contract-specific implementation");
-    }}
-    
+    }
+
     // Fallback function to trigger reentrancy
-    fallback() external payable {{
+    fallback() external payable {
         // Reentrant call logic here
-    }}
-}}
+    }
+}
 '''
-    
-    return {
+    elif category == "unchecked-call":
+        return "// Unchecked call test would require contract-specific implementation"
+    elif category == "timestamp":
+        return "// Timestamp manipulation test template"
+    elif category == "integer":
+        return "// Integer overflow test template"
+    return "// Generic vulnerability test template"
+
+# Prebuilt per-category exploit results; wrappers hand out shallow copies so
+# callers can mutate their result without touching the shared template.
+_CATEGORY_RESULTS = {
+    "reentrancy": {
         "test_generated": True,
         "test_executed": False,
         "exploit_confirmed": False,
         "test_output": "Reentrancy test template generated",
         "confidence_score": 0.7,  # High confidence for reentrancy detection
-        "test_code": test_template
-    }
-
-def generate_unchecked_call_test(finding: Dict[str, Any], contract_code: str, run_id: str) -> Dict[str, Any]:
-    """Generates an unchecked call exploit test."""
-    log("Generating unchecked call exploit test", run_id)
-    
-    return {
+        "test_code": _template_for("reentrancy")
+    },
+    "unchecked-call": {
         "test_generated": True,
         "test_executed": False,
         "exploit_confirmed": False,
         "test_output": "Unchecked call vulnerability detected - manual verification recommended",
         "confidence_score": 0.6,
-        "test_code": "// Unchecked call test would require contract-specific implementation"
-    }
-
-def generate_timestamp_test(finding: Dict[str, Any], contract_code: str, run_id: str) -> Dict[str, Any]:
-    """Generates a timestamp manipulation test."""
-    log("Generating timestamp manipulation test", run_id)
-    
-    return {
+        "test_code": _template_for("unchecked-call")
+    },
+    "timestamp": {
         "test_generated": True,
         "test_executed": False,
         "exploit_confirmed": False,
         "test_output": "Timestamp dependency detected - block.timestamp manipulation possible",
         "confidence_score": 0.5,
-        "test_code": "// Timestamp manipulation test template"
-    }
-
-def generate_integer_overflow_test(finding: Dict[str, Any], contract_code: str, run_id: str) -> Dict[str, Any]:
-    """Generates an integer overflow/underflow test."""
-    log("Generating integer overflow/underflow test", run_id)
-    
-    return {
+        "test_code": _template_for("timestamp")
+    },
+    "integer": {
         "test_generated": True,
         "test_executed": False,
         "exploit_confirmed": False,
         "test_output": "Integer overflow/underflow vulnerability detected",
         "confidence_score": 0.8,
-        "test_code": "// Integer overflow test template"
+        "test_code": _template_for("integer")
     }
+}
+
+def generate_reentrancy_test(finding: Dict[str, Any], ctx: AuditContext) -> Dict[str, Any]:
+    """Generates a reentrancy exploit test."""
+    log("Generating reentrancy exploit test", ctx.run_id)
+    return copy.copy(_CATEGORY_RESULTS["reentrancy"])
+
+def generate_unchecked_call_test(finding: Dict[str, Any], ctx: AuditContext) -> Dict[str, Any]:
+    """Generates an unchecked call exploit test."""
+    log("Generating unchecked call exploit test", ctx.run_id)
+    return copy.copy(_CATEGORY_RESULTS["unchecked-call"])
 
-def generate_generic_test(finding: Dict[str, Any], contract_code: str, run_id: str) -> Dict[str, Any]:
+def generate_timestamp_test(finding: Dict[str, Any], ctx: AuditContext) -> Dict[str, Any]:
+    """Generates a timestamp manipulation test."""
+    log("Generating timestamp manipulation test", ctx.run_id)
+    return copy.copy(_CATEGORY_RESULTS["timestamp"])
+
+def generate_integer_overflow_test(finding: Dict[str, Any], ctx: AuditContext) -> Dict[str, Any]:
+    """Generates an integer overflow/underflow test."""
+    log("Generating integer overflow/underflow test", ctx.run_id)
+    return copy.copy(_CATEGORY_RESULTS["integer"])
+
+def generate_generic_test(finding: Dict[str, Any], ctx: AuditContext) -> Dict[str, Any]:
     """Generates a generic test for unspecified vulnerability types."""
-    log(f"Generating generic test for vulnerability type: {finding.get('check', 'unknown')}", run_id)
+    log(f"Generating generic test for vulnerability type: {finding.get('check', 'unknown')}", ctx.run_id)
     
     return {
         "test_generated": True,
@@ -343,87 +676,181 @@ def generate_generic_test(finding: Dict[str, Any], contract_code: str, run_id: s
         "test_code": "// Generic vulnerability test template"
     }
 
+# Single compiled scan classifies the vulnerability type in one pass; the
+# matched group name keys straight into the handler table, so alternative
+# spellings fold onto one category without a separate alias map.
+_VULN_CLASSIFIER = re.compile(
+    r'(?P<reentrancy>reentrancy)'
+    r'|(?P<unchecked>unchecked-call|low-level-calls)'
+    r'|(?P<timestamp>timestamp)'
+    r'|(?P<integer>integer|overflow|underflow)'
+)
+_HANDLERS = {
+    "reentrancy": generate_reentrancy_test,
+    "unchecked": generate_unchecked_call_test,
+    "timestamp": generate_timestamp_test,
+    "integer": generate_integer_overflow_test
+}
+
+# Additive severity adjustment applied on top of the 0.5 base score
+_SEVERITY_BOOST = {'critical': 0.3, 'high': 0.3, 'medium': 0.1}
+
 def calculate_final_score(finding: Dict[str, Any], exploit_result: Dict[str, Any]) -> float:
     """
     Calculates a final exploitability score based on static analysis and exploit testing.
     """
-    base_score = 0.5  # Default score
-    
-    # Adjust based on severity
+    # Adjust the default score based on severity
     severity = finding.get('impact', finding.get('severity', 'Medium')).lower()
-    if severity in ['high', 'critical']:
-        base_score += 0.3
-    elif severity in ['medium']:
-        base_score += 0.1
-    
+    base_score = 0.5 + _SEVERITY_BOOST.get(severity, 0.0)
+
     # Adjust based on exploit test confidence
     confidence = exploit_result.get('confidence_score', 0.0)
     base_score = (base_score + confidence) / 2
-    
+
     # Cap at 1.0
     return min(base_score, 1.0)
 
-def main():
-    """Main execution function for Agent 2."""
-    if len(sys.argv) != 4:
-        log("FATAL: Usage: python3 agent2.py <contract_path> <agent1_report_path> <run_id>", "unknown")
-        sys.exit(1)
-    
-    contract_path = Path(sys.argv[1])
-    agent1_report_path = Path(sys.argv[2])
-    run_id = sys.argv[3]
-    
+def assign_final_scores(all_findings: List[Dict[str, Any]]) -> None:
+    """
+    Writes final_exploitability_score onto every finding. With NumPy the
+    arithmetic runs as one vectorized pass over severity/confidence arrays
+    instead of a Python call per finding.
+    """
+    if np is None or not all_findings:
+        for finding in all_findings:
+            finding["final_exploitability_score"] = calculate_final_score(
+                finding, finding["exploit_test"]
+            )
+        return
+
+    sev = np.array([
+        _SEVERITY_BOOST.get(f.get('impact', f.get('severity', 'Medium')).lower(), 0.0)
+        for f in all_findings
+    ])
+    conf = np.array([
+        f["exploit_test"].get("confidence_score", 0.0)
+        for f in all_findings
+    ])
+    scores = np.minimum((0.5 + sev + conf) / 2, 1.0)
+    for finding, score in zip(all_findings, scores.tolist()):
+        finding["final_exploitability_score"] = float(score)
+
+def process_findings(findings: List[Dict[str, Any]], source: str,
+                     ctx: AuditContext) -> List[Dict[str, Any]]:
+    """
+    Generates exploit tests for a batch of findings on a thread pool.
+    The generators are cheap today, but the pool makes the dispatch
+    I/O-parallel-ready for when tests are actually executed (e.g. Foundry).
+    Args:
+        findings: Findings from Agent 1 or Mythril
+        source: Origin tag recorded on each enhanced finding
+        ctx: Shared audit context for this run
+    Returns:
+        List of enhanced findings with exploit test results attached
+    """
+    if not findings:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(32, len(findings))) as executor:
+        exploit_results = list(executor.map(
+            lambda finding: generate_exploit_test(finding, ctx),
+            findings
+        ))
+
+    return [
+        {
+            **finding,
+            "source": source,
+            "exploit_test": exploit_result,
+            "confirmed": exploit_result.get("exploit_confirmed", False)
+        }
+        for finding, exploit_result in zip(findings, exploit_results)
+    ]
+
+def write_report(report: Dict[str, Any]) -> None:
+    """
+    Streams the final report to stdout as JSON. The envelope fields and each
+    finding are serialized and written individually, so peak memory stays at
+    one finding rather than the whole serialized report.
+    Args:
+        report: The final report dict; the "findings" list is streamed
+    """
+    out = sys.stdout.buffer
+    out.write(b'{\n')
+    first = True
+    for key, value in report.items():
+        if not first:
+            out.write(b',\n')
+        first = False
+        out.write(_json_dumps(key))
+        out.write(b': ')
+        if key == "findings":
+            out.write(b'[\n')
+            for index, finding in enumerate(value):
+                if index:
+                    out.write(b',\n')
+                out.write(_json_dumps(finding))
+            out.write(b'\n]')
+        else:
+            out.write(_json_dumps(value))
+    out.write(b'\n}\n')
+    out.flush()
+
+async def amain(contract_path: Path, agent1_report_path: Path, run_id: str,
+                no_mythril: bool = False) -> None:
+    """Async main body for Agent 2: runs Mythril concurrently with Agent 1 finding processing."""
     log(f"Initializing exploit confirmation for {contract_path.name}", run_id)
-    
+
     try:
-        # 1. Read Agent 1 findings
-        with open(agent1_report_path, 'r') as f:
-            agent1_findings = json.load(f)
-        
+        # 1. Read Agent 1 findings (single read; the decoder parses one buffer)
+        agent1_findings = _json_loads(agent1_report_path.read_bytes())
+
         log(f"Loaded {len(agent1_findings)} findings from Agent 1", run_id)
-        
+
         # 2. Read contract code
-        with open(contract_path, 'r') as f:
-            contract_code = f.read()
-        
-        # 3. Run Mythril symbolic execution
-        mythril_findings = run_mythril_analysis(contract_path, run_id)
-        
+        contract_code = contract_path.read_text(encoding='utf-8')
+
+        # 3. Launch Mythril symbolic execution in the background (unless skipped)
+        mythril_task = None
+        if no_mythril:
+            log("Skipping Mythril symbolic execution (--no-mythril)", run_id)
+        else:
+            mythril_task = asyncio.create_task(run_mythril_analysis_async(contract_path, run_id))
+
         # 4. Process all findings and generate exploit tests
-        all_findings = []
-        
-        # Process Agent 1 findings
-        for finding in agent1_findings:
-            log(f"Processing Agent 1 finding: {finding.get('check', 'Unknown')}", run_id)
-            exploit_result = generate_exploit_test(finding, contract_code, run_id)
-            
-            enhanced_finding = {
-                **finding,
-                "source": "agent1",
-                "exploit_test": exploit_result,
-                "final_exploitability_score": calculate_final_score(finding, exploit_result),
-                "confirmed": exploit_result.get("exploit_confirmed", False)
-            }
-            all_findings.append(enhanced_finding)
-        
-        # Process Mythril findings
-        for finding in mythril_findings:
-            log(f"Processing Mythril finding: {finding.get('title', 'Unknown')}", run_id)
-            exploit_result = generate_exploit_test(finding, contract_code, run_id)
-            
-            enhanced_finding = {
-                **finding,
-                "source": "mythril",
-                "exploit_test": exploit_result,
-                "final_exploitability_score": calculate_final_score(finding, exploit_result),
-                "confirmed": exploit_result.get("exploit_confirmed", False)
-            }
-            all_findings.append(enhanced_finding)
-        
-        # 5. Generate final report
-        confirmed_exploits = [f for f in all_findings if f.get("confirmed", False)]
-        high_confidence_findings = [f for f in all_findings if f.get("final_exploitability_score", 0) > 0.7]
+
+        ctx = AuditContext(contract_code=contract_code, contract_path=contract_path, run_id=run_id)
+
+        # Process Agent 1 findings while Mythril runs. The processing is
+        # synchronous, so it must run off the event loop; otherwise the
+        # Mythril task would only start once all findings were processed.
+        log(f"Processing {len(agent1_findings)} Agent 1 findings", run_id)
+        if mythril_task is not None:
+            mythril_findings, all_findings = await asyncio.gather(
+                mythril_task,
+                asyncio.to_thread(process_findings, agent1_findings, "agent1", ctx)
+            )
+        else:
+            mythril_findings = []
+            all_findings = process_findings(agent1_findings, "agent1", ctx)
+
+        log(f"Processing {len(mythril_findings)} Mythril findings", run_id)
+        all_findings += process_findings(mythril_findings, "mythril", ctx)
+
+        # Score everything in one vectorized pass
+        assign_final_scores(all_findings)
         
+        # 5. Generate final report: aggregate all counters in a single pass
+        confirmed_count = high_confidence_count = 0
+        critical_count = medium_count = low_count = 0
+        for f in all_findings:
+            score = f.get("final_exploitability_score", 0)
+            confirmed_count += bool(f.get("confirmed", False))
+            high_confidence_count += score > 0.7
+            critical_count += score > 0.8
+            medium_count += 0.5 < score <= 0.8
+            low_count += score <= 0.5
+
         final_report = {
             "contract": str(contract_path),
             "run_id": run_id,
@@ -431,18 +858,18 @@ def main():
             "agent1_findings_count": len(agent1_findings),
             "mythril_findings_count": len(mythril_findings),
             "total_findings": len(all_findings),
-            "confirmed_exploits": len(confirmed_exploits),
-            "high_confidence_findings": len(high_confidence_findings),
+            "confirmed_exploits": confirmed_count,
+            "high_confidence_findings": high_confidence_count,
             "findings": all_findings,
             "summary": {
-                "critical_vulnerabilities": len([f for f in all_findings if f.get("final_exploitability_score", 0) > 0.8]),
-                "medium_vulnerabilities": len([f for f in all_findings if 0.5 < f.get("final_exploitability_score", 0) <= 0.8]),
-                "low_vulnerabilities": len([f for f in all_findings if f.get("final_exploitability_score", 0) <= 0.5])
+                "critical_vulnerabilities": critical_count,
+                "medium_vulnerabilities": medium_count,
+                "low_vulnerabilities": low_count
             }
         }
         
-        # 6. Output clean JSON to stdout
-        print(json.dumps(final_report, indent=2))
+        # 6. Output clean JSON to stdout, streaming the findings array
+        write_report(final_report)
         log(f"Agent 2 analysis complete. Processed {len(all_findings)} total findings", run_id)
         
     except FileNotFoundError as e:
@@ -455,5 +882,33 @@ def main():
         log(f"FATAL: Unexpected error: {e}", run_id)
         sys.exit(1)
 
+# Built once at import; the flags let dev loops skip the expensive stages
+_PARSER = argparse.ArgumentParser(
+    prog="agent2.py",
+    description="Agent 2: confirms vulnerabilities via symbolic execution and exploit testing"
+)
+_PARSER.add_argument("contract_path", type=Path, help="Path to the Solidity contract")
+_PARSER.add_argument("agent1_report_path", type=Path, help="Path to the Agent 1 findings JSON")
+_PARSER.add_argument("run_id", help="Unique ID for the audit run")
+_PARSER.add_argument("--no-mythril", action="store_true",
+                     help="Skip the Mythril symbolic execution stage")
+_PARSER.add_argument("--no-hcs", action="store_true",
+                     help="Disable HCS logging for this run")
+_PARSER.add_argument("--cache-dir", type=Path, default=None,
+                     help="Override the Mythril result cache directory")
+
+def main():
+    """Main execution function for Agent 2."""
+    global _HCS_ENABLED, _CACHE_DIR
+    args = _PARSER.parse_args()
+
+    if args.no_hcs:
+        _HCS_ENABLED = False
+    if args.cache_dir is not None:
+        _CACHE_DIR = args.cache_dir
+
+    asyncio.run(amain(args.contract_path, args.agent1_report_path, args.run_id,
+                      no_mythril=args.no_mythril))
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
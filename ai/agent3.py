@@ -4,45 +4,135 @@ Agent 3: The Remediation Agent
 Generates security fixes and recommendations based on vulnerabilities confirmed by Agent 2.
 Provides secure code alternatives and best practices for identified issues.
 """
+import atexit
+import functools
 import json
 import sys
 import os
 import re
+import threading
 import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
 from hedera import Client, PrivateKey, TopicMessageSubmitTransaction, TopicId
 
+# Optional NumPy for vectorized priority computation on large reports
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Optional Aho-Corasick automaton for multi-keyword check classification;
+# scales better than regex alternation as the set of detector names grows
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Optional streaming JSON parser; we fall back to a buffered parse without it
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Optional orjson for fast (de)serialization of the large report payloads
+try:
+    import orjson
+
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode()
+
+    _json_loads = json.loads
+
 # Load environment variables
 load_dotenv()
 
+# HCS logging is enabled once per process; the TEST_MODE environment does not
+# change mid-run, so there is no need to consult os.environ on every log line.
+_HCS_ENABLED = os.getenv('TEST_MODE', 'true').lower() != 'true'
+
+# HCS-bound messages are buffered and flushed in batches so each log line no
+# longer pays a synchronous network round-trip. The lock serializes buffer
+# access now that findings can be processed on worker threads.
+_LOG_BUFFER: List[str] = []
+_LOG_BUFFER_LIMIT = 16
+_LOG_LOCK = threading.Lock()
+
 def log(message: str, run_id: str) -> None:
     """
     Prints a structured log message to stderr for the Master Agent to capture.
+    HCS-bound messages are buffered and submitted in batches.
     Args:
         message: The log message
         run_id: The unique ID for the audit run
     """
     log_message = f"[Agent 3][{run_id}] {message}"
-    print(log_message, file=sys.stderr)
-    
-    # Submit to HCS if not in test mode
-    if os.getenv('TEST_MODE', 'true').lower() != 'true':
-        try:
-            submit_hcs_log(log_message)
-        except Exception as e:
-            print(f"[Agent 3][{run_id}] HCS logging failed: {e}", file=sys.stderr)
+    # Single write keeps the line atomic and skips print's sep/end handling
+    sys.stderr.write(log_message + "\n")
+
+    # Buffer for HCS if not in test mode
+    if _HCS_ENABLED:
+        with _LOG_LOCK:
+            _LOG_BUFFER.append(log_message)
+            should_flush = len(_LOG_BUFFER) >= _LOG_BUFFER_LIMIT
+        if should_flush:
+            flush_hcs()
+
+def flush_hcs() -> None:
+    """Submits all buffered log messages to HCS as one batched message."""
+    with _LOG_LOCK:
+        if not _LOG_BUFFER:
+            return
+        batch = "\n".join(_LOG_BUFFER)
+        _LOG_BUFFER.clear()
+    _hcs_executor().submit(submit_hcs_log, batch)
+
+@functools.lru_cache(maxsize=1)
+def _hcs_executor() -> ThreadPoolExecutor:
+    """Small pool for fire-and-forget HCS submissions, created on first flush."""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="hcs-log")
+
+def _shutdown_hcs() -> None:
+    """Drains in-flight submissions and flushes the tail batch at exit.
+
+    The tail is submitted synchronously: by the time atexit hooks run, the
+    executor machinery is already shutting down and would refuse new work.
+    """
+    if _hcs_executor.cache_info().currsize:
+        _hcs_executor().shutdown(wait=True)
+    with _LOG_LOCK:
+        batch = "\n".join(_LOG_BUFFER)
+        _LOG_BUFFER.clear()
+    if batch:
+        submit_hcs_log(batch)
+
+# Registered unconditionally so short runs that never hit the flush threshold
+# still submit their buffered messages.
+atexit.register(_shutdown_hcs)
 
+@functools.lru_cache(maxsize=1)
 def create_hedera_client():
-    """Create and configure a Hedera client for HCS logging."""
+    """Create and configure a Hedera client for HCS logging.
+
+    Memoized so the EC key derivation and gRPC channel setup happen once per
+    process instead of once per log submission.
+    """
     try:
         from hedera import Client, PrivateKey
-        
+
         account_id = os.getenv('HEDERA_ACCOUNT_ID')
         private_key_str = os.getenv('HEDERA_PRIVATE_KEY')
-        
-        if not account_id or private_key_str:
+
+        if not account_id or not private_key_str:
             return None
             
         # Handle hex-encoded private key (with or without 0x prefix)
@@ -60,89 +150,95 @@ def create_hedera_client():
         print(f"Failed to create Hedera client: {e}", file=sys.stderr)
         return None
 
+@functools.lru_cache(maxsize=1)
+def _remediation_topic_id():
+    """Parses the remediation topic ID once; it is constant across a run."""
+    topic_id = os.getenv('HEDERA_TOPIC_ID_REMEDIATION')
+    return TopicId.fromString(topic_id) if topic_id else None
+
 def submit_hcs_log(message):
-    """Submit a log message to Hedera Consensus Service."""
+    """Submit a (possibly batched) log message to Hedera Consensus Service."""
     try:
         client = create_hedera_client()
         if not client:
             return
-            
-        topic_id = os.getenv('HEDERA_TOPIC_ID_REMEDIATION')
+
+        topic_id = _remediation_topic_id()
         if not topic_id:
             return
-            
+
         transaction = TopicMessageSubmitTransaction() \
-            .setTopicId(TopicId.fromString(topic_id)) \
+            .setTopicId(topic_id) \
             .setMessage(message)
-            
-        response = transaction.execute(client)
-        receipt = response.getReceipt(client)
-        
+
+        # Fire-and-forget: audit logging does not need to block on the receipt
+        transaction.execute(client)
+
     except Exception as e:
         print(f"HCS submission failed: {e}", file=sys.stderr)
 
-def generate_reentrancy_fix(finding: Dict[str, Any], contract_code: str) -> Dict[str, Any]:
-    """Generate remediation for reentrancy vulnerabilities."""
-    return {
+# Remediation templates are static, so they are built once at import instead of
+# re-allocating the same dict and string literals for every finding. The
+# generate_*_fix wrappers hand out shallow copies; sys.intern on the code
+# examples lets identical strings share storage through serialization.
+_TEMPLATES: Dict[str, Dict[str, Any]] = {
+    "reentrancy": {
         "vulnerability_type": "reentrancy",
         "severity": "Critical",
         "description": "Reentrancy vulnerability allows attackers to drain contract funds",
-        "remediation_steps": [
+        "remediation_steps": (
             "Implement the Checks-Effects-Interactions pattern",
             "Use OpenZeppelin's ReentrancyGuard modifier",
             "Update state variables before external calls",
             "Consider using pull payment pattern"
-        ],
-        "secure_code_example": """
+        ),
+        "secure_code_example": sys.intern("""
 // SECURE: Using ReentrancyGuard
 import "@openzeppelin/contracts/security/ReentrancyGuard.sol";
 
 contract SecureContract is ReentrancyGuard {
     mapping(address => uint256) public balances;
-    
+
     function withdraw() external nonReentrant {
         uint256 amount = balances[msg.sender];
         require(amount > 0, "No balance to withdraw");
-        
+
         // Effects: Update state before interaction
         balances[msg.sender] = 0;
-        
+
         // Interaction: External call last
         (bool success, ) = msg.sender.call{value: amount}("");
         require(success, "Transfer failed");
     }
 }
-        """,
-        "prevention_measures": [
+        """),
+        "prevention_measures": (
             "Always follow Checks-Effects-Interactions pattern",
             "Use mutex locks (ReentrancyGuard)",
             "Limit gas forwarded to external calls",
             "Implement proper access controls"
-        ]
-    }
-
-def generate_unchecked_call_fix(finding: Dict[str, Any], contract_code: str) -> Dict[str, Any]:
-    """Generate remediation for unchecked external call vulnerabilities."""
-    return {
+        )
+    },
+    "unchecked_external_call": {
         "vulnerability_type": "unchecked_external_call",
         "severity": "High",
         "description": "Unchecked external calls can lead to silent failures and unexpected behavior",
-        "remediation_steps": [
+        "remediation_steps": (
             "Always check return values of external calls",
             "Use require() statements for critical operations",
             "Implement proper error handling",
             "Consider using try-catch for external contract calls"
-        ],
-        "secure_code_example": """
+        ),
+        "secure_code_example": sys.intern("""
 // SECURE: Proper error handling for external calls
 contract SecureContract {
     function safeTransfer(address payable recipient, uint256 amount) external {
         require(address(this).balance >= amount, "Insufficient balance");
-        
+
         // Method 1: Check return value
         (bool success, ) = recipient.call{value: amount}("");
         require(success, "Transfer failed");
-        
+
         // Method 2: Using try-catch (for contract calls)
         // try externalContract.someFunction() {
         //     // Success handling
@@ -151,42 +247,39 @@ contract SecureContract {
         // }
     }
 }
-        """,
-        "prevention_measures": [
+        """),
+        "prevention_measures": (
             "Always check return values of .call(), .send(), .transfer()",
             "Use require() for critical operations",
             "Implement comprehensive error handling",
             "Consider gas limits for external calls"
-        ]
-    }
-
-def generate_integer_overflow_fix(finding: Dict[str, Any], contract_code: str) -> Dict[str, Any]:
-    """Generate remediation for integer overflow vulnerabilities."""
-    return {
+        )
+    },
+    "integer_overflow": {
         "vulnerability_type": "integer_overflow",
-        "severity": "High", 
+        "severity": "High",
         "description": "Integer overflow/underflow can lead to unexpected behavior and fund loss",
-        "remediation_steps": [
+        "remediation_steps": (
             "Use Solidity 0.8.0+ with built-in overflow protection",
             "Use OpenZeppelin's SafeMath library for older versions",
             "Add explicit overflow checks",
             "Use appropriate data types for values"
-        ],
-        "secure_code_example": """
+        ),
+        "secure_code_example": sys.intern("""
 // SECURE: Using Solidity 0.8.0+ (built-in overflow protection)
 pragma solidity ^0.8.0;
 
 contract SecureContract {
     mapping(address => uint256) public balances;
-    
+
     function deposit() external payable {
         // Automatic overflow protection in Solidity 0.8.0+
         balances[msg.sender] += msg.value;
     }
-    
+
     function transfer(address to, uint256 amount) external {
         require(balances[msg.sender] >= amount, "Insufficient balance");
-        
+
         // Safe arithmetic operations
         balances[msg.sender] -= amount;
         balances[to] += amount;
@@ -196,42 +289,39 @@ contract SecureContract {
 // For older Solidity versions, use SafeMath:
 // import "@openzeppelin/contracts/utils/math/SafeMath.sol";
 // using SafeMath for uint256;
-        """,
-        "prevention_measures": [
+        """),
+        "prevention_measures": (
             "Use Solidity 0.8.0+ for automatic overflow protection",
             "Use SafeMath library for older versions",
             "Validate input parameters",
             "Use appropriate data types"
-        ]
-    }
-
-def generate_timestamp_dependency_fix(finding: Dict[str, Any], contract_code: str) -> Dict[str, Any]:
-    """Generate remediation for timestamp dependency vulnerabilities."""
-    return {
+        )
+    },
+    "timestamp_dependency": {
         "vulnerability_type": "timestamp_dependency",
         "severity": "Medium",
         "description": "Reliance on block.timestamp can be manipulated by miners",
-        "remediation_steps": [
+        "remediation_steps": (
             "Avoid using block.timestamp for critical logic",
             "Use block numbers instead of timestamps when possible",
             "Implement time windows instead of exact timestamps",
             "Consider using external time oracles for critical timing"
-        ],
-        "secure_code_example": """
+        ),
+        "secure_code_example": sys.intern("""
 // SECURE: Using block numbers and time windows
 contract SecureContract {
     uint256 public startBlock;
     uint256 public constant BLOCKS_PER_DAY = 6400; // Approximate
-    
+
     constructor() {
         startBlock = block.number;
     }
-    
+
     function isWithinTimeWindow() public view returns (bool) {
         // Use block numbers instead of timestamps
         return block.number >= startBlock + BLOCKS_PER_DAY;
     }
-    
+
     // If timestamp is necessary, use time windows
     function isWithinWindow(uint256 windowStart, uint256 windowEnd) public view returns (bool) {
         require(windowEnd > windowStart, "Invalid window");
@@ -239,74 +329,68 @@ contract SecureContract {
         return block.timestamp >= windowStart && block.timestamp <= windowEnd + 900;
     }
 }
-        """,
-        "prevention_measures": [
+        """),
+        "prevention_measures": (
             "Use block numbers for time-based logic when possible",
             "Implement time windows with tolerance",
             "Avoid exact timestamp comparisons",
             "Consider external time oracles for critical applications"
-        ]
-    }
-
-def generate_access_control_fix(finding: Dict[str, Any], contract_code: str) -> Dict[str, Any]:
-    """Generate remediation for access control vulnerabilities."""
-    return {
+        )
+    },
+    "access_control": {
         "vulnerability_type": "access_control",
         "severity": "Critical",
         "description": "Improper access controls can allow unauthorized actions",
-        "remediation_steps": [
+        "remediation_steps": (
             "Implement proper role-based access control",
             "Use OpenZeppelin's AccessControl or Ownable",
             "Add function modifiers for access restrictions",
             "Implement multi-signature for critical operations"
-        ],
-        "secure_code_example": """
+        ),
+        "secure_code_example": sys.intern("""
 // SECURE: Using OpenZeppelin AccessControl
 import "@openzeppelin/contracts/access/AccessControl.sol";
 
 contract SecureContract is AccessControl {
     bytes32 public constant ADMIN_ROLE = keccak256("ADMIN_ROLE");
     bytes32 public constant OPERATOR_ROLE = keccak256("OPERATOR_ROLE");
-    
+
     constructor() {
         _grantRole(DEFAULT_ADMIN_ROLE, msg.sender);
         _grantRole(ADMIN_ROLE, msg.sender);
     }
-    
+
     function adminFunction() external onlyRole(ADMIN_ROLE) {
         // Only admins can call this function
     }
-    
+
     function operatorFunction() external onlyRole(OPERATOR_ROLE) {
         // Only operators can call this function
     }
-    
+
     function grantOperatorRole(address account) external onlyRole(ADMIN_ROLE) {
         _grantRole(OPERATOR_ROLE, account);
     }
 }
-        """,
-        "prevention_measures": [
+        """),
+        "prevention_measures": (
             "Use established access control patterns",
             "Implement role-based permissions",
             "Add proper function modifiers",
             "Regular access control audits"
-        ]
-    }
-
-def generate_solc_version_fix(finding: Dict[str, Any], contract_code: str) -> Dict[str, Any]:
-    """Generate remediation for Solidity version issues."""
-    return {
+        )
+    },
+    "solc_version": {
         "vulnerability_type": "solc_version",
         "severity": "Low",
         "description": "Using outdated or problematic Solidity versions can introduce known bugs",
-        "remediation_steps": [
+        "remediation_steps": (
             "Update to latest stable Solidity version",
             "Use specific version instead of caret ranges",
             "Review Solidity release notes for breaking changes",
             "Test thoroughly after version updates"
-        ],
-        "secure_code_example": """
+        ),
+        "secure_code_example": sys.intern("""
 // SECURE: Use latest stable version with specific version
 pragma solidity 0.8.19; // Use specific version, not ^0.8.0
 
@@ -314,28 +398,25 @@ contract SecureContract {
     // Contract implementation with latest Solidity features
     // and security improvements
 }
-        """,
-        "prevention_measures": [
+        """),
+        "prevention_measures": (
             "Keep Solidity version up to date",
             "Use specific versions in production",
             "Monitor Solidity security advisories",
             "Test with multiple compiler versions"
-        ]
-    }
-
-def generate_generic_fix(finding: Dict[str, Any], contract_code: str) -> Dict[str, Any]:
-    """Generate generic remediation advice for unknown vulnerability types."""
-    return {
+        )
+    },
+    "generic": {
         "vulnerability_type": "generic",
-        "severity": finding.get("impact", "Medium"),
-        "description": f"Security issue detected: {finding.get('check', 'Unknown')}",
-        "remediation_steps": [
+        "severity": "Medium",
+        "description": "Security issue detected",
+        "remediation_steps": (
             "Review the specific vulnerability details",
             "Consult Solidity security best practices",
             "Consider using established security libraries",
             "Implement comprehensive testing"
-        ],
-        "secure_code_example": """
+        ),
+        "secure_code_example": sys.intern("""
 // GENERAL SECURITY BEST PRACTICES:
 // 1. Use latest Solidity version
 // 2. Implement proper access controls
@@ -350,43 +431,110 @@ import "@openzeppelin/contracts/access/Ownable.sol";
 contract SecureContract is ReentrancyGuard, Ownable {
     // Implement security best practices
 }
-        """,
-        "prevention_measures": [
+        """),
+        "prevention_measures": (
             "Follow security development lifecycle",
             "Use static analysis tools",
             "Implement comprehensive testing",
             "Regular security audits"
-        ]
+        )
     }
+}
 
-def generate_remediation(finding: Dict[str, Any], contract_code: str) -> Dict[str, Any]:
-    """Generate appropriate remediation based on vulnerability type."""
-    check_type = finding.get("check", "").lower()
-    
-    if "reentrancy" in check_type:
-        return generate_reentrancy_fix(finding, contract_code)
-    elif "external-call" in check_type or "unchecked" in check_type:
-        return generate_unchecked_call_fix(finding, contract_code)
-    elif "overflow" in check_type or "underflow" in check_type:
-        return generate_integer_overflow_fix(finding, contract_code)
-    elif "timestamp" in check_type or "time" in check_type:
-        return generate_timestamp_dependency_fix(finding, contract_code)
-    elif "access" in check_type or "owner" in check_type or "modifier" in check_type:
-        return generate_access_control_fix(finding, contract_code)
-    elif "solc-version" in check_type or "pragma" in check_type:
-        return generate_solc_version_fix(finding, contract_code)
-    else:
-        return generate_generic_fix(finding, contract_code)
-
-def calculate_remediation_priority(finding: Dict[str, Any]) -> int:
-    """Calculate remediation priority based on severity and exploitability."""
-    impact = finding.get("impact", "").lower()
-    confidence = finding.get("confidence", "").lower()
-    exploitability_score = finding.get("final_exploitability_score", 0)
-    confirmed = finding.get("confirmed", False)
-    
+def generate_reentrancy_fix(finding: Dict[str, Any]) -> Dict[str, Any]:
+    """Generate remediation for reentrancy vulnerabilities."""
+    return _TEMPLATES["reentrancy"].copy()
+
+def generate_unchecked_call_fix(finding: Dict[str, Any]) -> Dict[str, Any]:
+    """Generate remediation for unchecked external call vulnerabilities."""
+    return _TEMPLATES["unchecked_external_call"].copy()
+
+def generate_integer_overflow_fix(finding: Dict[str, Any]) -> Dict[str, Any]:
+    """Generate remediation for integer overflow vulnerabilities."""
+    return _TEMPLATES["integer_overflow"].copy()
+
+def generate_timestamp_dependency_fix(finding: Dict[str, Any]) -> Dict[str, Any]:
+    """Generate remediation for timestamp dependency vulnerabilities."""
+    return _TEMPLATES["timestamp_dependency"].copy()
+
+def generate_access_control_fix(finding: Dict[str, Any]) -> Dict[str, Any]:
+    """Generate remediation for access control vulnerabilities."""
+    return _TEMPLATES["access_control"].copy()
+
+def generate_solc_version_fix(finding: Dict[str, Any]) -> Dict[str, Any]:
+    """Generate remediation for Solidity version issues."""
+    return _TEMPLATES["solc_version"].copy()
+
+# Each code example ships once in the report's top-level "code_templates"
+# object; per-remediation entries carry only a key into it, so a report with
+# ten reentrancy findings no longer repeats the same snippet ten times.
+_CODE_TEMPLATES = {key: template["secure_code_example"] for key, template in _TEMPLATES.items()}
+
+def generate_generic_fix(finding: Dict[str, Any]) -> Dict[str, Any]:
+    """Generate generic remediation advice for unknown vulnerability types."""
+    fix = _TEMPLATES["generic"].copy()
+    fix["severity"] = finding.get("impact", "Medium")
+    fix["description"] = f"Security issue detected: {finding.get('check', 'Unknown')}"
+    return fix
+
+# Keyword-to-handler table; a single compiled alternation scan replaces the
+# chain of substring tests in generate_remediation. "timestamp" is listed
+# before "time" so the longer keyword wins at the same position.
+_CHECK_DISPATCH = {
+    "reentrancy": generate_reentrancy_fix,
+    "external-call": generate_unchecked_call_fix,
+    "unchecked": generate_unchecked_call_fix,
+    "overflow": generate_integer_overflow_fix,
+    "underflow": generate_integer_overflow_fix,
+    "timestamp": generate_timestamp_dependency_fix,
+    "time": generate_timestamp_dependency_fix,
+    "access": generate_access_control_fix,
+    "owner": generate_access_control_fix,
+    "modifier": generate_access_control_fix,
+    "solc-version": generate_solc_version_fix,
+    "pragma": generate_solc_version_fix,
+}
+_CHECK_PATTERN = re.compile("|".join(map(re.escape, _CHECK_DISPATCH)))
+
+# Linear-time multi-keyword matcher built once at import; keyword count no
+# longer affects scan cost, unlike the regex alternation fallback
+if ahocorasick is not None:
+    _CHECK_AUTOMATON = ahocorasick.Automaton()
+    for _keyword, _handler in _CHECK_DISPATCH.items():
+        _CHECK_AUTOMATON.add_word(_keyword, _handler)
+    _CHECK_AUTOMATON.make_automaton()
+else:
+    _CHECK_AUTOMATON = None
+
+def generate_remediation(finding: Dict[str, Any],
+                         check_type: Optional[str] = None) -> Dict[str, Any]:
+    """Generate appropriate remediation based on vulnerability type.
+
+    Callers that have already extracted and lowercased the check name can pass
+    it via check_type to skip the repeated lookup.
+    """
+    if check_type is None:
+        check_type = finding.get("check", "").lower()
+
+    if _CHECK_AUTOMATON is not None:
+        for _end, handler in _CHECK_AUTOMATON.iter(check_type):
+            return handler(finding)
+        return generate_generic_fix(finding)
+
+    match = _CHECK_PATTERN.search(check_type)
+    if match:
+        return _CHECK_DISPATCH[match.group(0)](finding)
+    return generate_generic_fix(finding)
+
+def calculate_remediation_priority(impact: str, confidence: str,
+                                   exploitability_score: float, confirmed: bool) -> int:
+    """Calculate remediation priority based on severity and exploitability.
+
+    Takes the already-extracted, lowercased finding fields so callers bind
+    them once per finding instead of repeating dict lookups here.
+    """
     priority = 0
-    
+
     # Base priority on impact
     if impact == "critical":
         priority += 100
@@ -411,9 +559,119 @@ def calculate_remediation_priority(finding: Dict[str, Any]) -> int:
     # Boost if confirmed exploit
     if confirmed:
         priority += 50
-    
+
     return priority
 
+# Below this many findings, NumPy array setup costs more than it saves
+_VECTORIZE_THRESHOLD = 50
+
+def assign_priorities(remediations: List[Dict[str, Any]], findings: List[Dict[str, Any]]) -> None:
+    """
+    Writes the remediation priority for every finding. Large batches run as
+    one vectorized NumPy pass over impact/confidence/score/confirmed arrays;
+    small batches use the scalar helper directly.
+    """
+    if np is None or len(findings) <= _VECTORIZE_THRESHOLD:
+        for remediation, finding in zip(remediations, findings):
+            impact, confidence, score, confirmed = map(
+                finding.get,
+                ("impact", "confidence", "final_exploitability_score", "confirmed")
+            )
+            remediation["priority"] = calculate_remediation_priority(
+                (impact or "").lower(), (confidence or "").lower(),
+                score or 0, bool(confirmed)
+            )
+        return
+
+    impacts = np.array([f.get("impact", "").lower() for f in findings])
+    confidences = np.array([f.get("confidence", "").lower() for f in findings])
+    scores = np.array([f.get("final_exploitability_score", 0) for f in findings], dtype=float)
+    confirmed = np.array([bool(f.get("confirmed", False)) for f in findings])
+
+    impact_scores = np.select(
+        [impacts == "critical", impacts == "high", impacts == "medium", impacts == "low"],
+        [100, 80, 60, 40],
+        default=20
+    )
+    confidence_scores = np.select(
+        [confidences == "high", confidences == "medium"],
+        [20, 10],
+        default=0
+    )
+    priorities = (
+        impact_scores
+        + confidence_scores
+        + (scores * 20).astype(int)
+        + confirmed.astype(int) * 50
+    )
+    for remediation, priority in zip(remediations, priorities.tolist()):
+        remediation["priority"] = int(priority)
+
+# Below this many findings, thread pool startup costs more than it saves
+_PARALLEL_THRESHOLD = 64
+
+def process_finding(finding: Dict[str, Any], run_id: str) -> Dict[str, Any]:
+    """
+    Builds the full remediation entry for one finding. Findings are
+    independent, so this is safe to run from pool workers.
+    Args:
+        finding: A single finding from the Agent 2 report
+        run_id: Unique ID for the audit run
+    Returns:
+        The remediation dict for the report
+    """
+    # Bind every needed field in one pass instead of scattered .get chains
+    check, impact, confidence, confirmed, score, finding_id = map(
+        finding.get,
+        ("check", "impact", "confidence", "confirmed", "final_exploitability_score", "id")
+    )
+
+    log(f"Generating remediation for {check or 'unknown'} vulnerability", run_id)
+
+    remediation = generate_remediation(finding, (check or "").lower())
+    # Replace the embedded code example with a reference into the
+    # report-level code_templates table
+    remediation.pop("secure_code_example", None)
+    remediation["secure_code_example_ref"] = remediation["vulnerability_type"]
+    remediation["finding_id"] = finding_id if finding_id is not None else "unknown"
+    remediation["original_finding"] = {
+        "check": check,
+        "impact": impact,
+        "confidence": confidence,
+        "confirmed": bool(confirmed),
+        "exploitability_score": score if score is not None else 0
+    }
+    return remediation
+
+def write_report(report: Dict[str, Any]) -> None:
+    """
+    Streams the remediation report to stdout as JSON. Envelope fields and each
+    remediation are serialized and written individually, so peak memory stays
+    at one remediation rather than the whole serialized report.
+    Args:
+        report: The report dict; the "remediations" list is streamed
+    """
+    out = sys.stdout.buffer
+    out.write(b'{\n')
+    first = True
+    for key, value in report.items():
+        if not first:
+            out.write(b',\n')
+        first = False
+        out.write(_json_dumps(key))
+        out.write(b': ')
+        if key == "remediations":
+            out.write(b'[\n')
+            for index, remediation in enumerate(value):
+                if index:
+                    out.write(b',\n')
+                out.write(_json_dumps(remediation))
+            out.write(b'\n]')
+        else:
+            out.write(_json_dumps(value))
+    out.write(b'\n}\n')
+    out.flush()
+
 def main():
     """Main function for Agent 3 remediation analysis."""
     if len(sys.argv) != 4:
@@ -425,46 +683,41 @@ def main():
     log("Starting remediation analysis", run_id)
     
     try:
-        # Load Agent 2 report
-        with open(agent2_report_path, 'r') as f:
-            agent2_report = json.load(f)
-        
-        log(f"Loaded Agent 2 report with {len(agent2_report.get('findings', []))} findings", run_id)
-        
-        # Load contract code
-        contract_code = ""
-        if os.path.exists(contract_path):
-            with open(contract_path, 'r') as f:
-                contract_code = f.read()
-        
-        # Generate remediations
-        remediations = []
-        findings = agent2_report.get("findings", [])
-        
-        for finding in findings:
-            log(f"Generating remediation for {finding.get('check', 'unknown')} vulnerability", run_id)
-            
-            remediation = generate_remediation(finding, contract_code)
-            remediation["finding_id"] = finding.get("id", "unknown")
-            remediation["priority"] = calculate_remediation_priority(finding)
-            remediation["original_finding"] = {
-                "check": finding.get("check"),
-                "impact": finding.get("impact"),
-                "confidence": finding.get("confidence"),
-                "confirmed": finding.get("confirmed", False),
-                "exploitability_score": finding.get("final_exploitability_score", 0)
-            }
-            
-            remediations.append(remediation)
+        # Load only the findings array from the Agent 2 report; everything else
+        # in the envelope is unused here, so with ijson the findings stream in
+        # one at a time instead of materializing the whole report
+        with open(agent2_report_path, 'rb') as f:
+            if ijson is not None:
+                findings = list(ijson.items(f, "findings.item", use_float=True))
+            else:
+                findings = _json_loads(f.read()).get("findings", [])
+
+        log(f"Loaded Agent 2 report with {len(findings)} findings", run_id)
         
-        # Sort by priority (highest first)
-        remediations.sort(key=lambda x: x["priority"], reverse=True)
+        # Generate remediations; large reports fan out across a thread pool
+        if len(findings) > _PARALLEL_THRESHOLD:
+            log(f"Generating remediations for {len(findings)} findings in parallel", run_id)
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                remediations = list(executor.map(
+                    lambda finding: process_finding(finding, run_id),
+                    findings
+                ))
+        else:
+            remediations = [
+                process_finding(finding, run_id)
+                for finding in findings
+            ]
+
+        # Compute priorities in one batch, then sort (highest first)
+        assign_priorities(remediations, findings)
+        remediations.sort(key=itemgetter("priority"), reverse=True)
         
-        # Generate summary
-        critical_count = sum(1 for r in remediations if r["severity"] == "Critical")
-        high_count = sum(1 for r in remediations if r["severity"] == "High")
-        medium_count = sum(1 for r in remediations if r["severity"] == "Medium")
-        low_count = sum(1 for r in remediations if r["severity"] == "Low")
+        # Generate summary in a single pass
+        severity_counts = Counter(r["severity"] for r in remediations)
+        critical_count = severity_counts.get("Critical", 0)
+        high_count = severity_counts.get("High", 0)
+        medium_count = severity_counts.get("Medium", 0)
+        low_count = severity_counts.get("Low", 0)
         
         # Create final report
         remediation_report = {
@@ -480,6 +733,7 @@ def main():
                 "medium_remediations": medium_count,
                 "low_remediations": low_count
             },
+            "code_templates": _CODE_TEMPLATES,
             "remediations": remediations,
             "general_recommendations": [
                 "Implement comprehensive input validation",
@@ -506,8 +760,8 @@ def main():
         log(f"Generated {len(remediations)} remediations", run_id)
         log(f"Priority breakdown - Critical: {critical_count}, High: {high_count}, Medium: {medium_count}, Low: {low_count}", run_id)
         
-        # Output the JSON report to stdout
-        print(json.dumps(remediation_report, indent=2))
+        # Output the JSON report to stdout, streaming the remediations array
+        write_report(remediation_report)
         
     except Exception as e:
         error_report = {
@@ -518,7 +772,9 @@ def main():
             "timestamp": int(time.time())
         }
         log(f"Error during remediation analysis: {str(e)}", run_id)
-        print(json.dumps(error_report, indent=2))
+        sys.stdout.buffer.write(_json_dumps(error_report))
+        sys.stdout.buffer.write(b'\n')
+        sys.stdout.buffer.flush()
         sys.exit(1)
 
 if __name__ == "__main__":